@@ -1,12 +1,173 @@
+import mmap
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def integer_sqrt(val):
+    """
+    Exact floor square root for arbitrarily large non negative ints.
+    Newton iteration seeded from the bit length, the number of correct bits doubles on
+    every step so the cost is dominated by the last (full size) division, O(M(n)).
+    """
+    if val < 0:
+        raise ValueError("square root of negative number")
+    if val == 0:
+        return 0
+    c = (val.bit_length() - 1) // 2
+    a = 1 # floor sqrt of the top bits seen so far
+    d = 0
+    for s in reversed(range(c.bit_length())):
+        # extend a from the top e+1 bits of the root to the top d+1 bits
+        e = d
+        d = c >> s
+        a = (a << (d - e - 1)) + (val >> (2*c - e - d + 1)) // a
+    return a - (a*a > val)
+
 def nearest_perfect_square(val):
-    return int(pow(val,0.5))**2
+    root = integer_sqrt(val)
+    return root*root
+
+TABLE_MAGIC = b'SQDT'
+TABLE_HEADER = struct.Struct('<4sII') # magic, version, max area
+
+def build_decomposition_table(path, max_area=1000000):
+    """
+    Precomputes the decomposition of every area in [0, max_area] and writes it to path.
+    File layout (little endian uint32): header, offsets[0 .. max_area+1], values
+    where the squares of an area are values[offsets[area]:offsets[area+1]]
+
+    Greedy decomposition of a is the nearest square s followed by the decomposition
+    of a - s, which is already in the table, so building is linear in the output size.
+    """
+    offsets = array('I', [0, 0]) # area 0 has no squares
+    values = array('I')
+    for area in range(1, max_area + 1):
+        np_val = nearest_perfect_square(area)
+        values.append(np_val)
+        rest = area - np_val
+        values.extend(values[offsets[rest]:offsets[rest+1]])
+        offsets.append(len(values))
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+        values.byteswap()
+    with open(path, 'wb') as fp:
+        fp.write(TABLE_HEADER.pack(TABLE_MAGIC, 1, max_area))
+        offsets.tofile(fp)
+        values.tofile(fp)
+
+class DecompositionTable(object):
+    """
+    Read only memory mapped view of a file written by build_decomposition_table.
+    Nothing is loaded at startup, every lookup is two offset reads and one slice read
+    and the pages are shared between all processes mapping the same file.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as fp:
+            self.buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_area = TABLE_HEADER.unpack_from(self.buf, 0)
+        if magic != TABLE_MAGIC or version != 1:
+            self.buf.close()
+            raise ValueError("not a decomposition table: %s" % path)
+        self.values_start = TABLE_HEADER.size + 4 * (self.max_area + 2)
+
+    def __contains__(self, area):
+        return 0 <= area <= self.max_area
+
+    def lookup(self, area):
+        """
+        Returns the decomposition of area as a list
+        """
+        if area not in self:
+            raise KeyError(area)
+        start, end = struct.unpack_from('<II', self.buf, TABLE_HEADER.size + 4 * area)
+        count = end - start
+        return list(struct.unpack_from('<%dI' % count, self.buf, self.values_start + 4 * start))
 
-def solution(area):
+    def close(self):
+        self.buf.close()
+
+def solution(area, table=None):
+    if table is not None and area in table:
+        store = table.lookup(area)
+        print(','.join([str(i) for i in store]))
+        return store
+    store = list(iter_squares(area))
+    print(','.join([str(i) for i in store]))
+    return store
+
+def iter_squares(area):
+    """
+    Generator version of the greedy loop, yields every square as soon as it is found
+    """
     left = area
-    store = []
     while(left>0):
         np_val = nearest_perfect_square(left)
         left = left - np_val
-        store.append(np_val)
-    print(','.join([str(i) for i in store]))
-    return store
\ No newline at end of file
+        yield np_val
+
+def stream_solutions(areas):
+    """
+    Lazily decomposes an iterator of areas (which may be unbounded), yielding one
+    (area, squares) pair at a time. Only the current area is ever held in memory.
+    """
+    for area in areas:
+        yield area, list(iter_squares(area))
+
+def _batch_numpy(areas):
+    """
+    Vectorized greedy decomposition, every area takes one step per iteration
+    the greedy loop ends after a handful of steps so we loop on steps and not on areas
+    """
+    if isinstance(areas, (list, tuple, np.ndarray)):
+        left = np.asarray(areas, dtype=np.int64).ravel()
+    else:
+        left = np.fromiter(areas, dtype=np.int64) # generators, sets, map objects
+    # like the greedy loop, a non positive area has no squares
+    left = np.maximum(left, 0)
+    steps = []
+    while left.any():
+        root = np.floor(np.sqrt(left)).astype(np.int64)
+        # float sqrt can be off by one near perfect squares, fix it up.
+        # Compare with floor division instead of squaring, (root + 1)**2 overflows
+        # int64 for areas close to 2**63
+        root -= (root > left // np.maximum(root, 1))
+        root += ((root + 1) <= left // (root + 1))
+        square = root * root
+        steps.append(square)
+        left = left - square
+    if not steps:
+        return np.zeros(0, dtype=np.int64), np.zeros(len(left) + 1, dtype=np.int64)
+    table = np.stack(steps, axis=1) # one row per area, zero padded
+    mask = table > 0
+    offsets = np.zeros(len(left) + 1, dtype=np.int64)
+    np.cumsum(mask.sum(axis=1), out=offsets[1:])
+    return table[mask], offsets
+
+def solution_batch(areas):
+    """
+    Decomposes many areas at once, nothing is printed.
+    Returns a ragged layout (values, offsets) where the squares of the i th area are
+    values[offsets[i]:offsets[i+1]]
+    With numpy available both are int64 numpy arrays, otherwise array('l')
+    areas can be any iterable, but every area has to fit in 64 bits (below 2**63)
+    or OverflowError is raised, use stream_solutions for larger areas
+    """
+    if np is not None:
+        return _batch_numpy(areas)
+    values = array('l')
+    offsets = array('l', [0])
+    for area in areas:
+        if area >= 2**63:
+            raise OverflowError("area does not fit in 64 bits: %d" % area)
+        values.extend(iter_squares(area))
+        offsets.append(len(values))
+    return values, offsets
+
+if __name__ == "__main__":
+    print(solution(12))
+    print(solution_batch([12, 15324]))
\ No newline at end of file
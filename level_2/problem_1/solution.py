@@ -1,3 +1,17 @@
+import heapq
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def is_greater(val1, val2):
     """
     if val1 >= val2 return True
@@ -38,7 +52,10 @@ def heapify(arr, n, i):
         heapify(arr, n, largest)
 
 
-def solution(arr):
+def heap_sort(arr):
+    """
+    Original in place heapsort on is_greater, kept around for comparison
+    """
     n = len(arr)
   
     # Build a maxheap.
@@ -51,4 +68,399 @@ def solution(arr):
         arr[i], arr[0] = arr[0], arr[i]   # swap
         heapify(arr, i, 0)
 
-    return arr
\ No newline at end of file
+    return arr
+
+def version_key(val):
+    """
+    Parses a version once into a tuple of ints.
+    Tuple comparison goes place by place and a tuple that is a prefix of
+    another is smaller, which is exactly the "shorter wins on tie" rule of is_greater
+    """
+    return tuple([int(v) for v in val.split('.')])
+
+# packed key layout, most significant first: major | minor | revision | count
+FIELD_BITS = 20
+COUNT_BITS = 2
+FIELD_MAX = (1 << FIELD_BITS) - 1
+
+def pack_version(val):
+    """
+    Packs a version into one 64 bit int, missing minor/revision are stored as 0
+    and the number of components goes in the lowest bits, so comparing packed keys
+    is the same as comparing version_key tuples
+    """
+    splits = val.split('.')
+    if len(splits) > 3:
+        raise ValueError("more than major.minor.revision: %s" % val)
+    key = 0
+    for pos in range(3):
+        part = int(splits[pos]) if pos < len(splits) else 0
+        if part > FIELD_MAX:
+            raise ValueError("component too large to pack: %s" % val)
+        key = (key << FIELD_BITS) | part
+    return (key << COUNT_BITS) | len(splits)
+
+def pack_versions(arr):
+    """
+    Packed keys of all versions in a flat array('Q'), 8 bytes per version.
+    Raises ValueError if some version does not fit the packed layout
+    """
+    keys = array('Q')
+    keys.extend(pack_version(val) for val in arr)
+    return keys
+
+def packed_argsort(keys):
+    """
+    Stable argsort of packed keys. Uses numpy when present, otherwise a LSD radix sort
+    on 16 bit digits that only moves ints around inside flat arrays.
+    """
+    n = len(keys)
+    if np is not None:
+        return np.argsort(np.frombuffer(keys, dtype=np.uint64), kind='stable')
+    order = array('L', range(n))
+    if n == 0:
+        return order
+    top_bits = max(keys).bit_length()
+    scratch = array('L', order)
+    for shift in range(0, top_bits, 16):
+        counts = [0] * ((1 << 16) + 1)
+        for idx in order:
+            counts[((keys[idx] >> shift) & 0xffff) + 1] += 1
+        for digit in range(1 << 16):
+            counts[digit + 1] += counts[digit] # starting slot of every digit
+        for idx in order:
+            digit = (keys[idx] >> shift) & 0xffff
+            scratch[counts[digit]] = idx
+            counts[digit] += 1
+        order, scratch = scratch, order
+    return order
+
+PARALLEL_MIN_SIZE = 100000 # below this the pool start up costs more than it saves
+
+def _sort_chunk(chunk):
+    """
+    Parses and sorts one chunk, returns (packed keys, versions) both in sorted order
+    so the parent never parses a version again. keys is None when some version of
+    the chunk cannot be packed, the versions are then sorted on version_key.
+    """
+    try:
+        keys = pack_versions(chunk)
+    except ValueError:
+        chunk.sort(key=version_key)
+        return None, chunk
+    order = sorted(range(len(chunk)), key=keys.__getitem__)
+    return array('Q', [keys[idx] for idx in order]), [chunk[idx] for idx in order]
+
+def parallel_sort(arr, workers=None, min_size=PARALLEL_MIN_SIZE):
+    """
+    Splits arr into one chunk per worker, each worker process parses and sorts
+    its chunk on packed keys and sends back the sorted keys along with the run.
+    The parent concatenates the runs and sorts on the precomputed keys, timsort
+    finds the runs and only merges them.
+    workers=None uses every core, small inputs are sorted serially.
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers < 1:
+        raise ValueError("workers must be at least 1: %r" % workers)
+    if workers < 2 or len(arr) < min_size:
+        arr.sort(key=version_key)
+        return arr
+    step = -(-len(arr) // workers) # ceil division
+    chunks = [arr[pos:pos + step] for pos in range(0, len(arr), step)]
+    pool = multiprocessing.Pool(workers)
+    try:
+        runs = pool.map(_sort_chunk, chunks)
+    finally:
+        pool.close()
+        pool.join()
+    keys = array('Q')
+    del arr[:]
+    for run_keys, run in runs:
+        if keys is not None and run_keys is not None:
+            keys.extend(run_keys)
+        else:
+            keys = None
+        arr.extend(run)
+    if keys is None:
+        # some version did not fit the packed layout, merge on parsed keys
+        arr.sort(key=version_key)
+        return arr
+    order = sorted(range(len(arr)), key=keys.__getitem__)
+    arr[:] = [arr[idx] for idx in order]
+    return arr
+
+def solution(arr, packed=False, workers=None):
+    """
+    Every version is parsed only once into its key and the sort runs on the keys,
+    instead of re-splitting both strings on each comparison.
+    With packed=True the keys are held in a flat 64 bit buffer instead of one tuple
+    per version, which is what to use for very large inventories. Versions that do not
+    fit the packed layout (more than 3 components, or one above FIELD_MAX) make it fall
+    back to the tuple keys.
+    With workers set the list is sorted in chunks on a process pool.
+    """
+    if workers is not None:
+        return parallel_sort(arr, workers)
+    if packed:
+        try:
+            keys = pack_versions(arr)
+        except ValueError:
+            keys = None
+        if keys is not None:
+            order = packed_argsort(keys)
+            arr[:] = [arr[idx] for idx in order]
+            return arr
+    arr.sort(key=version_key)
+    return arr
+
+def _write_run(versions, tmp_dir):
+    """
+    Writes a sorted run to a temporary file and returns its path
+    """
+    fd, path = tempfile.mkstemp(suffix='.run', dir=tmp_dir)
+    with os.fdopen(fd, 'w') as fp:
+        for val in versions:
+            fp.write(val + '\n')
+    return path
+
+def _read_run(fp):
+    for line in fp:
+        yield line.rstrip('\n')
+
+def _merge_runs(paths, out_fp):
+    files = [open(path) for path in paths]
+    try:
+        for val in heapq.merge(*[_read_run(fp) for fp in files], key=version_key):
+            out_fp.write(val + '\n')
+    finally:
+        for fp in files:
+            fp.close()
+
+def external_sort(in_fp, out_fp, memory_budget=64 * 2**20, fan_in=64, tmp_dir=None):
+    """
+    Sorts a newline delimited version file that does not fit in memory.
+    Lines are read until roughly memory_budget bytes of text are held, that chunk is
+    sorted with the same ordering as is_greater and spilled as a run. Runs are then
+    k-way merged, at most fan_in files at a time, onto out_fp.
+    """
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2: %r" % fan_in)
+    runs = []
+    temp_paths = [] # every run file still on disk, removed even if a pass fails
+    chunk = []
+    held = 0
+    try:
+        for line in in_fp:
+            val = line.strip()
+            if not val:
+                continue
+            chunk.append(val)
+            held += len(val) + 64 # rough per string overhead
+            if held >= memory_budget:
+                chunk.sort(key=version_key)
+                runs.append(_write_run(chunk, tmp_dir))
+                temp_paths.append(runs[-1])
+                chunk = []
+                held = 0
+        chunk.sort(key=version_key)
+        if not runs:
+            # everything fit in memory, no need to spill
+            for val in chunk:
+                out_fp.write(val + '\n')
+            return
+        if chunk:
+            runs.append(_write_run(chunk, tmp_dir))
+            temp_paths.append(runs[-1])
+        chunk = []
+
+        # merge passes until one pass can write straight to the output
+        while len(runs) > fan_in:
+            merged = []
+            for pos in range(0, len(runs), fan_in):
+                group = runs[pos:pos + fan_in]
+                fd, path = tempfile.mkstemp(suffix='.run', dir=tmp_dir)
+                temp_paths.append(path)
+                with os.fdopen(fd, 'w') as fp:
+                    _merge_runs(group, fp)
+                merged.append(path)
+                for path in group:
+                    os.remove(path)
+                    temp_paths.remove(path)
+            runs = merged
+        _merge_runs(runs, out_fp)
+    finally:
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+class _TreapNode(object):
+    __slots__ = ('key', 'val', 'priority', 'count', 'left', 'right')
+
+    def __init__(self, key, val, priority):
+        self.key = key
+        self.val = val
+        self.priority = priority
+        self.count = 1
+        self.left = None
+        self.right = None
+
+class VersionIndex(object):
+    """
+    Sorted index of versions ordered like is_greater, backed by a treap
+    (binary search tree balanced by random heap priorities), so insert, delete,
+    max lookup and range lookups take O(log n) expected time.
+    Nodes are keyed on (version_key, string) so "1.01" and "1.1" are kept apart,
+    inserting the same string twice only bumps its count.
+    """
+    def __init__(self, versions=(), seed=None):
+        self.root = None
+        self.size = 0
+        self.rng = random.Random(seed)
+        for val in versions:
+            self.insert(val)
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def _split(node, key):
+        """
+        Splits the tree into (keys < key, keys >= key)
+        """
+        if node is None:
+            return None, None
+        if node.key < key:
+            left, right = VersionIndex._split(node.right, key)
+            node.right = left
+            return node, right
+        left, right = VersionIndex._split(node.left, key)
+        node.left = right
+        return left, node
+
+    @staticmethod
+    def _merge(left, right):
+        """
+        Merges two trees where every key of left is smaller than every key of right
+        """
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = VersionIndex._merge(left.right, right)
+            return left
+        right.left = VersionIndex._merge(left, right.left)
+        return right
+
+    def _find(self, key):
+        node = self.root
+        while node is not None and node.key != key:
+            node = node.left if key < node.key else node.right
+        return node
+
+    def insert(self, val):
+        key = (version_key(val), val)
+        node = self._find(key)
+        if node is not None:
+            node.count += 1
+        else:
+            left, right = self._split(self.root, key)
+            new_node = _TreapNode(key, val, self.rng.random())
+            self.root = self._merge(self._merge(left, new_node), right)
+        self.size += 1
+
+    def delete(self, val):
+        """
+        Removes one occurrence of val, raises KeyError if it is not indexed
+        """
+        key = (version_key(val), val)
+        node = self._find(key)
+        if node is None:
+            raise KeyError(val)
+        self.size -= 1
+        if node.count > 1:
+            node.count -= 1
+            return
+        left, rest = self._split(self.root, key)
+        _, right = self._split(rest, (key[0], val + '\0')) # drop exactly this key
+        self.root = self._merge(left, right)
+
+    def __contains__(self, val):
+        return self._find((version_key(val), val)) is not None
+
+    def max(self):
+        """
+        Latest version in the index
+        """
+        node = self.root
+        if node is None:
+            raise ValueError("empty index")
+        while node.right is not None:
+            node = node.right
+        return node.val
+
+    def range(self, low=None, high=None):
+        """
+        Yields versions v with low <= v < high in ascending order, comparing parsed
+        keys. Either bound may be left out.
+        """
+        low_key = None if low is None else (version_key(low), '')
+        high_key = None if high is None else (version_key(high), '')
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            if node is not None:
+                if low_key is not None and node.key < low_key:
+                    node = node.right # whole left subtree is below the range
+                    continue
+                stack.append(node)
+                node = node.left
+                continue
+            node = stack.pop()
+            if high_key is not None and node.key >= high_key:
+                return
+            for _ in range(node.count):
+                yield node.val
+            node = node.right
+
+    def releases(self, prefix):
+        """
+        All versions under a prefix, e.g. releases("1.2") gives 1.2 and every 1.2.x
+        """
+        parts = version_key(prefix)
+        upper = parts[:-1] + (parts[-1] + 1,)
+        return self.range(prefix, '.'.join([str(p) for p in upper]))
+
+    def __iter__(self):
+        return self.range()
+
+def random_versions(n, seed=0):
+    rng = random.Random(seed)
+    versions = []
+    for _ in range(n):
+        parts = [rng.randint(0, 20) for _ in range(rng.randint(1, 3))]
+        versions.append('.'.join([str(p) for p in parts]))
+    return versions
+
+def benchmark(sizes=(10**5, 10**6, 10**7)):
+    """
+    Times the key sort against the heapsort on random version lists
+    """
+    for n in sizes:
+        versions = random_versions(n)
+        start = time.time()
+        heap_sorted = heap_sort(versions[:])
+        heap_time = time.time() - start
+        start = time.time()
+        key_sorted = solution(versions[:])
+        key_time = time.time() - start
+        assert heap_sorted == key_sorted
+        print("n=%d heapsort %.2fs key sort %.2fs speedup %.1fx" % (
+            n, heap_time, key_time, heap_time / max(key_time, 1e-9)))
+
+if __name__ == "__main__":
+    print(solution(["1.1.2", "1.0", "1.3.3", "1.0.12", "1.0.2"]))
+    print(solution(["1.11", "2.0.0", "1.2", "2", "0.1", "1.2.1", "1.1.1", "2.0"]))
+    if 'benchmark' in sys.argv[1:]:
+        benchmark()
\ No newline at end of file
@@ -1,3 +1,13 @@
+import multiprocessing
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def pair_wise(arr):
     divisible_pairs = []
     num_divisiblepair_perval = [0]*len(arr)
@@ -11,6 +21,229 @@ def pair_wise(arr):
 
     return divisible_pairs, num_divisiblepair_perval
 
+def smallest_prime_factors(limit):
+    """
+    Sieve returning spf where spf[v] is the smallest prime dividing v (for v >= 2)
+    Primes are written largest first so the smallest prime is the one left in place
+    """
+    spf = list(range(limit + 1))
+    root = int(limit ** 0.5)
+    small_primes = [p for p in range(2, root + 1)
+                    if all(p % q for q in range(2, int(p ** 0.5) + 1))]
+    for p in reversed(small_primes):
+        spf[p*p::p] = [p] * len(range(p*p, limit + 1, p))
+    return spf
+
+_spf_table = [] # sieve kept between calls, mostly for pool workers
+
+def prime_table(limit):
+    """
+    Smallest prime factor table covering limit, rebuilt only when it has to grow
+    """
+    global _spf_table
+    if len(_spf_table) <= limit:
+        # grow at least geometrically so a stream of rising values rebuilds rarely
+        _spf_table = smallest_prime_factors(max(limit, 2 * len(_spf_table)))
+    return _spf_table
+
+def divisors(val, spf):
+    """
+    All divisors of val built from its prime factorization
+    """
+    divs = [1]
+    while val > 1:
+        prime = spf[val]
+        power = 0
+        while val % prime == 0:
+            val //= prime
+            power += 1
+        divs = [d * prime**e for d in divs for e in range(power + 1)]
+    return divs
+
+def divisor_index(arr):
+    """
+    Pair finding stage shared by the counters: maps every distinct value of arr to
+    its divisors. arr[i] -> arr[j] (i < j) is an edge of the divisibility DAG exactly
+    when arr[i] is in the divisor list of arr[j].
+    """
+    if not arr:
+        return {}
+    spf = prime_table(max(arr))
+    index = {}
+    for val in arr:
+        if val not in index:
+            index[val] = divisors(val, spf)
+    return index
+
+def divisor_counts(arr):
+    """
+    For every index j counts
+    divided_by_earlier[j]: number of i < j with arr[i] dividing arr[j]
+    divides_later[j]: number of k > j with arr[j] dividing arr[k]
+    Uses a value -> count index and divisor enumeration, so the cost is
+    O(n * number of divisors) and no pair is ever stored.
+    """
+    index = divisor_index(arr)
+
+    divided_by_earlier = [0]*len(arr)
+    seen = {} # value -> count of earlier positions
+    for pos, val in enumerate(arr):
+        divided_by_earlier[pos] = sum([seen.get(d, 0) for d in index[val]])
+        seen[val] = seen.get(val, 0) + 1
+
+    divides_later = [0]*len(arr)
+    multiples = {} # value -> count of later positions it divides
+    for pos in range(len(arr) - 1, -1, -1):
+        val = arr[pos]
+        divides_later[pos] = multiples.get(val, 0)
+        for d in index[val]:
+            multiples[d] = multiples.get(d, 0) + 1
+    return divided_by_earlier, divides_later
+
+def divisor_counts_numpy(arr, block_size=2048):
+    """
+    Same counts as divisor_counts but from the divisibility relation
+    rel[i][j] = (arr[j] % arr[i] == 0) for i < j, built block by block with numpy.
+    Row sums give divides_later and column sums give divided_by_earlier,
+    peak memory is a few block_size x block_size arrays whatever the length.
+    """
+    if np is None:
+        raise ImportError("numpy is required for divisor_counts_numpy")
+    values = np.asarray(arr, dtype=np.int64)
+    n = len(values)
+    divided_by_earlier = np.zeros(n, dtype=np.int64)
+    divides_later = np.zeros(n, dtype=np.int64)
+    for row_start in range(0, n, block_size):
+        rows = values[row_start:row_start + block_size]
+        for col_start in range(row_start, n, block_size):
+            cols = values[col_start:col_start + block_size]
+            rel = (cols[np.newaxis, :] % rows[:, np.newaxis]) == 0
+            if col_start == row_start:
+                rel = np.triu(rel, k=1) # diagonal block, keep only j > i
+            divides_later[row_start:row_start + len(rows)] += rel.sum(axis=1)
+            divided_by_earlier[col_start:col_start + len(cols)] += rel.sum(axis=0)
+    return divided_by_earlier, divides_later
+
+def solution_numpy(arr, block_size=2048):
+    """
+    Vectorized version of solution, using divisor_counts_numpy
+    """
+    if len(arr) < 3:
+        return 0
+    divided_by_earlier, divides_later = divisor_counts_numpy(arr, block_size)
+    return int(np.dot(divided_by_earlier, divides_later))
+
+class TripleCounter(object):
+    """
+    Online lucky triple counter for append only lists.
+    Per value it keeps how many elements so far hold it and how many pairs (i, j)
+    so far end at it. An appended value closes a triple with every pair ending at one
+    of its divisors and opens a pair with every earlier divisor, so an append costs
+    O(number of divisors of the value) whatever the length of the list.
+    """
+    def __init__(self, values=()):
+        self.seen = {} # value -> number of positions holding it so far
+        self.pairs_ending = {} # value -> number of pairs (i, j) so far with arr[j] == value
+        self.total = 0
+        self.length = 0
+        self.extend(values)
+
+    def append(self, val):
+        """
+        Adds val at the end and returns the updated triple count
+        """
+        divs = divisors(val, prime_table(val))
+        pairs_ending = self.pairs_ending
+        seen = self.seen
+        self.total += sum([pairs_ending.get(d, 0) for d in divs])
+        pairs_ending[val] = pairs_ending.get(val, 0) + sum([seen.get(d, 0) for d in divs])
+        seen[val] = seen.get(val, 0) + 1
+        self.length += 1
+        return self.total
+
+    def extend(self, values):
+        for val in values:
+            self.append(val)
+        return self.total
+
+    def __len__(self):
+        return self.length
+
+def count_triples(arr, limit=None):
+    """
+    Counts the triples in one left to right pass with a TripleCounter.
+    The running count never goes down, so as soon as it exceeds limit we stop and
+    return None.
+    """
+    if arr:
+        prime_table(max(arr)) # one sieve for the whole list
+    counter = TripleCounter()
+    for val in arr:
+        total_sum = counter.append(val)
+        if limit is not None and total_sum > limit:
+            return None
+    return counter.total
+
+def _score_list(args):
+    pos, arr, target = args
+    return pos, count_triples(arr, target)
+
+def find_matching_list(lists, target, workers=None):
+    """
+    Scores many lists on a process pool and returns the position of a list with
+    exactly target lucky triples, or -1 if there is none.
+    Lists whose running count goes past target are abandoned mid way, and the pool
+    is torn down as soon as one match comes back, so with several matches the one
+    that finished first is returned.
+    """
+    pool = multiprocessing.Pool(workers)
+    try:
+        jobs = ((pos, arr, target) for pos, arr in enumerate(lists))
+        for pos, count in pool.imap_unordered(_score_list, jobs):
+            if count == target:
+                return pos
+    finally:
+        pool.terminate()
+        pool.join()
+    return -1
+
+def count_chains(arr, k):
+    """
+    Number of divisibility chains arr[i_1] | arr[i_2] | ... | arr[i_k] with
+    i_1 < i_2 < ... < i_k, count_chains(arr, 3) is the number of lucky triples.
+
+    Layered DP over the divisibility DAG in one left to right pass:
+    layers[l][v] is the number of chains of length l + 1 seen so far ending at value v,
+    a new value extends every chain ending at one of its divisors by one.
+    Costs O(k * E) where E is the number of (element, divisor) edges walked.
+    """
+    if k < 1:
+        raise ValueError("chain length must be at least 1")
+    index = divisor_index(arr)
+    layers = [{} for _ in range(k)]
+    for val in arr:
+        divs = index[val]
+        # longest layer first so this element never extends its own chains
+        for length in range(k - 1, 0, -1):
+            previous = layers[length - 1]
+            extended = sum([previous.get(d, 0) for d in divs])
+            if extended:
+                layers[length][val] = layers[length].get(val, 0) + extended
+        layers[0][val] = layers[0].get(val, 0) + 1
+    return sum(layers[k - 1].values())
+
+def benchmark_chains(n=20000, ks=range(2, 9), seed=0):
+    """
+    Times count_chains on one random list for every chain length in ks
+    """
+    rng = random.Random(seed)
+    arr = [rng.randint(1, 999999) for _ in range(n)]
+    divisor_index(arr) # warm up the sieve
+    for k in ks:
+        start = time.time()
+        count = count_chains(arr, k)
+        print("n=%d k=%d chains=%d %.2fs" % (n, k, count, time.time() - start))
+
 def solution(arr):
     """
     The problem statement is to find number of magic triplets (a_i, b_j, c_k) from interger array arr
@@ -21,13 +254,22 @@ def solution(arr):
     Now to find all magic triplets that start with (x_i, y_j) we simply add 
     the number of divisible pairs that begin y_j, hence summing up all the possible
     (x_i, y_j) we get the possible magic triplets
+
+    Same sum grouped by the middle element y_j: it is the number of earlier values that
+    divide y_j times the number of later values y_j divides. Both counts come from
+    divisor_counts without listing the pairs, so memory stays O(n).
     """
     if len(arr) < 3:
         return 0
-    # divisible pair num divisible
-    divisible_pairs, num_divisible = pair_wise(arr)
-    # sum up for all the pairs
+    # every triple is counted once at its middle element
+    divided_by_earlier, divides_later = divisor_counts(arr)
     total_sum = 0
-    for val1, val2 in divisible_pairs:
-        total_sum += num_divisible[val2]
-    return total_sum
\ No newline at end of file
+    for before, after in zip(divided_by_earlier, divides_later):
+        total_sum += before * after
+    return total_sum
+
+if __name__ == "__main__":
+    print(solution([1, 1, 1]))
+    print(solution([1, 2, 3, 4, 5, 6]))
+    if 'benchmark' in sys.argv[1:]:
+        benchmark_chains()
\ No newline at end of file
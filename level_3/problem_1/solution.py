@@ -1,59 +1,81 @@
+import hashlib
+import random
+import sys
+import time
+from collections import OrderedDict
+from fractions import Fraction
+
+try:
+    from math import gcd
+except ImportError: # python 2
+    from fractions import gcd
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class FracOps(object):
     """
     This class will help maintain the fractional protion of the solution
     just like floating/int multiplication addition and division is taken care of
+
+    Arithmetic results are left unreduced (normalize=False), reducing costs a gcd
+    so it is done lazily, only when normalize() is called or the value is read out.
     """
-    def __init__(self, numerator, denominator):
+    __slots__ = ('num', 'den', 'reduced')
+
+    def __init__(self, numerator, denominator, normalize=True):
         self.num = numerator
         self.den = denominator
-        self.normalize()
+        self.reduced = False
+        if normalize:
+            self.normalize()
         
     @staticmethod
     def gcd(int1, int2):
-        greater = int1 if int1 >= int2 else int2
-        smaller = int2 if int1 >= int2 else int1
-        if smaller == 0 or greater == 0:
-            return 1
-        while(greater % smaller):
-            temp = greater%smaller
-            greater = smaller
-            smaller = temp
-        return smaller
+        return gcd(int1, int2) or 1
     
     def normalize(self):
-        gcd_val = self.gcd(self.num, self.den)
-        self.num /= gcd_val
-        self.den /= gcd_val
+        if self.reduced:
+            return self
+        gcd_val = abs(self.gcd(self.num, self.den))
+        if self.den < 0:
+            gcd_val = -gcd_val # keep the sign on the numerator
+        # integer division keeps the fraction exact, the gcd always divides evenly
+        self.num //= gcd_val
+        self.den //= gcd_val
+        self.reduced = True
+        return self
     
     def __add__(val1, val2):
-        common_factor = (val1.den * val2.den) / val1.gcd(val1.den, val2.den)
-        num1 = val1.num * (common_factor/val1.den)
-        num2 = val2.num * (common_factor/val2.den)
-        num_summed = num1 + num2
-        return FracOps(num_summed, common_factor)
+        if val1.den == val2.den:
+            return FracOps(val1.num + val2.num, val1.den, False)
+        return FracOps(val1.num * val2.den + val2.num * val1.den, val1.den * val2.den, False)
     
     def __sub__(val1, val2):
-        new_frac = FracOps(val2.num * -1, val2.den)
-        return val1 + new_frac
+        if val1.den == val2.den:
+            return FracOps(val1.num - val2.num, val1.den, False)
+        return FracOps(val1.num * val2.den - val2.num * val1.den, val1.den * val2.den, False)
     
     def __mul__(val1, val2):
-        num_prod = val1.num * val2.num
-        den_prod = val1.den * val2.den
-        return FracOps(num_prod, den_prod)
+        return FracOps(val1.num * val2.num, val1.den * val2.den, False)
     
     def __div__(val1, val2):
         if val2.num==0:
             raise ZeroDivisionError("Zero fraction provided")
-        new_frac = FracOps(val2.den, val2.num)
-        return val1 * new_frac
+        return FracOps(val1.num * val2.den, val1.den * val2.num, False)
+
+    __truediv__ = __div__
     
     def common_den(self, list_fractions):
         lcm = 1
         final_nums = []
+        list_fractions = [frac.normalize() for frac in list_fractions]
         for frac in list_fractions:
             den = frac.den if frac.num !=0 else 1
-            lcm = lcm * den / self.gcd(lcm, den)
-        final_nums = [int(frac.num * lcm/frac.den) for frac in list_fractions]
+            lcm = lcm * den // self.gcd(lcm, den)
+        final_nums = [int(frac.num * lcm//frac.den) for frac in list_fractions]
         return final_nums + [int(lcm)]
 
 ## matix inverse
@@ -115,53 +137,77 @@ def transpose_matrix(m):
     """
     matrix transposition
     """
-    return map(lambda x: list(x), zip(*m))
+    return [list(col) for col in zip(*m)]
 
-def get_minor(m,i,j):
+def gauss_jordan_solve(a, b):
     """
-    gets the minor matrix for the given position
+    Solves a * x = b exactly with Gauss-Jordan elimination on the augmented matrix [a | b]
+    a is n x n and b is n x m, both of FracOps, returns x (n x m).
+    O(n^2 (n + m)) fraction operations instead of the O(n!) cofactor expansion.
     """
-    return [row[:j] + row[j+1:] for row in (m[:i]+m[i+1:])]
+    n = len(a)
+    aug = [row_a[:] + row_b[:] for row_a, row_b in zip(a, b)]
+    for col in range(n):
+        # any non zero pivot will do as everything is exact
+        pivot_row = col
+        while aug[pivot_row][col].num == 0:
+            pivot_row += 1
+            if pivot_row == n:
+                raise ZeroDivisionError("Singular matrix")
+        aug[col], aug[pivot_row] = aug[pivot_row], aug[col]
 
-def get_deternminant(m):
+        pivot = aug[col][col]
+        aug[col] = [(val / pivot).normalize() for val in aug[col]]
+        for row in range(n):
+            factor = aug[row][col]
+            if row == col or factor.num == 0:
+                continue
+            aug[row] = [(val - factor * pivot_val).normalize()
+                        for val, pivot_val in zip(aug[row], aug[col])]
+    return [row[n:] for row in aug]
+
+def fraction_free_solve(a, b):
     """
-    computes the determinant with a base case for 2 x 2
+    Integer version of gauss_jordan_solve (fraction free Gauss-Jordan, Bareiss).
+    a is n x n and b is n x m, both of ints. Every update
+        row = (pivot * row - factor * pivot_row) / previous pivot
+    divides exactly (Sylvester's identity), so everything stays an int of bounded size
+    and at the end x = numerators / den with one common denominator den = det(a)
+    Returns (numerators, den)
     """
-    #base case for 2x2 matrix
-    if len(m) == 2:
-        return m[0][0]*m[1][1]-m[0][1]*m[1][0]
+    n = len(a)
+    aug = [row_a[:] + row_b[:] for row_a, row_b in zip(a, b)]
+    prev = 1
+    for col in range(n):
+        pivot_row = col
+        while aug[pivot_row][col] == 0:
+            pivot_row += 1
+            if pivot_row == n:
+                raise ZeroDivisionError("Singular matrix")
+        aug[col], aug[pivot_row] = aug[pivot_row], aug[col]
 
-    determinant = FracOps(0,1)
-    for c in range(len(m)):
-        power_Val = FracOps(((-1)**(c)), 1)
-        determinant += power_Val*m[0][c]*get_deternminant(get_minor(m,0,c))
-    return determinant
+        pivot = aug[col][col]
+        pivot_vals = aug[col]
+        for row in range(n):
+            if row == col:
+                continue
+            factor = aug[row][col]
+            # rows with factor 0 are still scaled so all diagonals stay equal
+            aug[row] = [(pivot * val - factor * pivot_val) // prev
+                        for val, pivot_val in zip(aug[row], pivot_vals)]
+        prev = pivot
+    return [row[n:] for row in aug], prev
 
-def get_matrix_inverse(m):
+def reduce_common(numerators, den):
     """
-    Computes the determinant with adj method
+    numerators / den in the answer format, [num_1, ... num_k, den] in lowest terms
     """
-    determinant = get_deternminant(m)
-    negetive_one = FracOps(-1,1)
-    #special case for 2x2 matrix:
-    if len(m) == 2:
-        return [[m[1][1]/determinant, negetive_one*m[0][1]/determinant],
-                [negetive_one*m[1][0]/determinant, m[0][0]/determinant]]
-
-    #find matrix of cofactors
-    cofactors = []
-    for r in range(len(m)):
-        cofactorRow = []
-        for c in range(len(m)):
-            minor = get_minor(m,r,c)
-            power_Val = FracOps(((-1)**(r+c)), 1)
-            cofactorRow.append( power_Val * get_deternminant(minor))
-        cofactors.append(cofactorRow)
-    cofactors = transpose_matrix(cofactors)
-    for r in range(len(cofactors)):
-        for c in range(len(cofactors)):
-            cofactors[r][c] = cofactors[r][c]/determinant
-    return cofactors
+    gcd_val = den
+    for num in numerators:
+        gcd_val = gcd(gcd_val, num)
+    if den < 0:
+        gcd_val = -abs(gcd_val)
+    return [num // gcd_val for num in numerators] + [den // gcd_val]
 
 def mat_subtract(m1, m2):
     """
@@ -179,7 +225,7 @@ def frac_sum(iterable_fracs):
     zero_frac = FracOps(0,1)
     for frac in iterable_fracs:
         zero_frac += frac
-    return zero_frac
+    return zero_frac.normalize()
 
 def matmult(a,b):
     """
@@ -189,7 +235,412 @@ def matmult(a,b):
     return [[frac_sum(ele_a*ele_b for ele_a, ele_b in zip(row_a, col_b)) 
              for col_b in zip_b] for row_a in a]
 
-def solution(mat):
+def start_state_row(i_minus_q, r):
+    """
+    Row 0 of (I - Q)^-1 * R without solving for every start state.
+    z = e_0^T (I - Q)^-1 is the solution of (I - Q)^T z = e_0, a single right hand side,
+    and the absorption probabilities from state 0 are then z^T * R.
+    """
+    dim = len(i_minus_q)
+    e_0 = [[FracOps(1 if pos == 0 else 0, 1)] for pos in range(dim)]
+    z = gauss_jordan_solve(transpose_matrix(i_minus_q), e_0)
+    return matmult(transpose_matrix(z), r)[0]
+
+def integer_system(standard, num_absorption):
+    """
+    (I - Q) and R of the standard form scaled row by row with the row's total count,
+    so both are plain integer matrices: S_i * I - counts_Q and counts_R
+    """
+    a = []
+    counts_r = []
+    for pos, row in enumerate(standard[num_absorption:]):
+        total = sum(row)
+        a_row = [-count for count in row[num_absorption:]]
+        a_row[pos] += total
+        a.append(a_row)
+        counts_r.append(row[:num_absorption])
+    return a, counts_r
+
+def solve_integer(standard, num_absorption, start_only=True):
+    """
+    Common denominator integer mode, no fraction object anywhere.
+    With D the diagonal of row totals, (I - Q)^-1 R = (D (I - Q))^-1 (D R) = A^-1 counts_R
+    so row 0 is w^T counts_R where A^T w = e_0.
+    """
+    a, counts_r = integer_system(standard, num_absorption)
+    if start_only:
+        e_0 = [[1 if pos == 0 else 0] for pos in range(len(a))]
+        w, den = fraction_free_solve(transpose_matrix(a), e_0)
+        numerators = [sum([w_row[0] * r_row[col] for w_row, r_row in zip(w, counts_r)])
+                      for col in range(num_absorption)]
+    else:
+        x, den = fraction_free_solve(a, counts_r)
+        numerators = x[0]
+    return reduce_common(numerators, den)
+
+## sparse chains
+
+def csr_to_adjacency(indptr, indices, data):
+    """
+    Converts a CSR transition count matrix to the adjacency dict form
+    {state: {next_state: count}} taken by solve_sparse
+    """
+    adjacency = {}
+    for state in range(len(indptr) - 1):
+        row = {}
+        for pos in range(indptr[state], indptr[state + 1]):
+            if data[pos]:
+                row[indices[pos]] = data[pos]
+        adjacency[state] = row
+    return adjacency
+
+def sparse_solve(rows, rhs):
+    """
+    Solves a * x = rhs where row i of a is the dict rows[i] = {col: FracOps}
+    Gaussian elimination that only ever touches the stored entries,
+    every column is pivoted on the row with the fewest entries to limit fill in,
+    then back substitution in reverse pivot order.
+    """
+    n = len(rows)
+    rows = [dict(row) for row in rows]
+    rhs = rhs[:]
+    zero = FracOps(0, 1)
+    col_rows = {} # col -> rows holding an entry in that col
+    for pos, row in enumerate(rows):
+        for col in row:
+            col_rows.setdefault(col, set()).add(pos)
+
+    remaining = set(range(n))
+    order = []
+    for col in range(n):
+        candidates = [pos for pos in col_rows.get(col, ()) if pos in remaining]
+        if not candidates:
+            raise ZeroDivisionError("Singular matrix")
+        pivot = min(candidates, key=lambda pos: len(rows[pos]))
+        remaining.remove(pivot)
+        order.append((pivot, col))
+        pivot_row = rows[pivot]
+        for pos in candidates:
+            if pos == pivot:
+                continue
+            row = rows[pos]
+            factor = (row[col] / pivot_row[col]).normalize()
+            for pivot_col, pivot_val in pivot_row.items():
+                val = (row.get(pivot_col, zero) - factor * pivot_val).normalize()
+                if val.num == 0:
+                    row.pop(pivot_col, None)
+                    col_rows[pivot_col].discard(pos)
+                else:
+                    row[pivot_col] = val
+                    col_rows[pivot_col].add(pos)
+            rhs[pos] = (rhs[pos] - factor * rhs[pivot]).normalize()
+
+    x = [None] * n
+    for pivot, col in reversed(order):
+        pivot_row = rows[pivot]
+        val = rhs[pivot]
+        for other_col, other_val in pivot_row.items():
+            if other_col != col:
+                val = val - other_val * x[other_col]
+        x[col] = (val / pivot_row[col]).normalize()
+    return x
+
+def split_states(transitions, num_states=None):
+    """
+    Row totals of the transient states and the sorted list of terminal states
+    """
+    if num_states is None:
+        num_states = 1
+        for state, row in transitions.items():
+            num_states = max([num_states, state + 1] + [nxt + 1 for nxt in row])
+    totals = {}
+    for state, row in transitions.items():
+        total = sum(row.values())
+        if total:
+            totals[state] = total
+    terminal = [state for state in range(num_states) if state not in totals]
+    return totals, terminal
+
+def solve_sparse(transitions, num_states=None):
+    """
+    Same answer as solution but for an adjacency dict {state: {next_state: count}},
+    states without outgoing counts are terminal. Q and R are never made dense, the
+    start state row is found from the sparse system A^T w = e_0 with A = S*I - counts_Q
+    (see solve_integer) so time and memory follow the number of transitions.
+    """
+    totals, terminal = split_states(transitions, num_states)
+    if 0 not in totals:
+        result = [0] * len(terminal)
+        result[0] = 1
+        return result + [1]
+
+    transient = sorted(totals)
+    index = dict((state, pos) for pos, state in enumerate(transient))
+    rows_t = [{} for _ in transient] # rows of A^T
+    for state in transient:
+        pos = index[state]
+        rows_t[pos][pos] = totals[state]
+        for nxt, count in transitions[state].items():
+            if nxt in index and count:
+                col_row = rows_t[index[nxt]]
+                col_row[pos] = col_row.get(pos, 0) - count
+    rows_t = [dict((col, FracOps(val, 1)) for col, val in row.items() if val)
+              for row in rows_t]
+    e_0 = [FracOps(1 if pos == 0 else 0, 1) for pos in range(len(transient))]
+    w = sparse_solve(rows_t, e_0)
+
+    absorbed = dict((state, FracOps(0, 1)) for state in terminal)
+    for state in transient:
+        weight = w[index[state]]
+        for nxt, count in transitions[state].items():
+            if nxt in absorbed and count:
+                absorbed[nxt] = (absorbed[nxt] + weight * FracOps(count, 1)).normalize()
+    return FracOps(1,1).common_den([absorbed[state] for state in terminal])
+
+def strongly_connected_components(root, successors):
+    """
+    Iterative Tarjan from root, only states reachable from root are ever visited.
+    Returns the components in reverse topological order (a component comes before
+    every component that can reach it)
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+
+    def visit(node):
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        work.append((node, iter(successors(node))))
+
+    work = []
+    visit(root)
+    while work:
+        node, children = work[-1]
+        descended = False
+        for child in children:
+            if child not in index:
+                visit(child)
+                descended = True
+                break
+            if child in on_stack:
+                low[node] = min(low[node], index[child])
+        if descended:
+            continue
+        work.pop()
+        if work:
+            parent = work[-1][0]
+            low[parent] = min(low[parent], low[node])
+        if low[node] == index[node]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.remove(member)
+                component.append(member)
+                if member == node:
+                    break
+            components.append(sorted(component))
+    return components
+
+def solve_components(transitions, num_states=None):
+    """
+    Same answer as solve_sparse, solved one strongly connected component at a time.
+
+    States state 0 cannot reach are dropped, the rest is condensed into components
+    and walked in topological order pushing probability mass forward: the mass m
+    entering a component gives the expected visits v of its states from
+    (I - Q_C)^T v = m, and v spreads onto the states downstream and the terminals.
+    A long pipeline of small loops becomes many tiny solves instead of one big one,
+    and every solve is sparse (sparse_solve) so a big loop still costs in the order
+    of its transitions.
+    """
+    totals, terminal = split_states(transitions, num_states)
+    if 0 not in totals:
+        result = [0] * len(terminal)
+        result[0] = 1
+        return result + [1]
+
+    def successors(state):
+        return [nxt for nxt, count in transitions[state].items() if count and nxt in totals]
+
+    components = strongly_connected_components(0, successors)
+    components.reverse() # topological order, the component of state 0 first
+    zero = FracOps(0, 1)
+    mass = {0: FracOps(1, 1)}
+    absorbed = dict((state, zero) for state in terminal)
+    for component in components:
+        members = set(component)
+        inflow = [mass.pop(state, zero) for state in component]
+        self_loop = transitions[component[0]].get(component[0], 0)
+        if len(component) == 1 and not self_loop:
+            # no loop, every entry is a single visit
+            scaled = [(val / FracOps(totals[state], 1)).normalize()
+                      for state, val in zip(component, inflow)]
+        else:
+            # A_C^T u = m with A_C = S*I - counts_Q as in solve_sparse, u = S^-1 v
+            index = dict((state, pos) for pos, state in enumerate(component))
+            rows_t = [{pos: totals[state]} for pos, state in enumerate(component)]
+            for src in component:
+                for dst, count in transitions[src].items():
+                    if dst in members and count:
+                        col_row = rows_t[index[dst]]
+                        col_row[index[src]] = col_row.get(index[src], 0) - count
+            rows_t = [dict((col, FracOps(val, 1)) for col, val in row.items() if val)
+                      for row in rows_t]
+            scaled = sparse_solve(rows_t, inflow)
+        for state, weight in zip(component, scaled):
+            if weight.num == 0:
+                continue
+            for nxt, count in transitions[state].items():
+                if not count or nxt in members:
+                    continue
+                flow = weight * FracOps(count, 1)
+                target = mass if nxt in totals else absorbed
+                target[nxt] = (target.get(nxt, zero) + flow).normalize()
+    return FracOps(1,1).common_den([absorbed[state] for state in terminal])
+
+## batched solves
+
+def lu_factorize(a):
+    """
+    Exact LU factorization of a square FracOps matrix with row pivoting,
+    returns (lu, perm) where L (unit diagonal) and U are packed in lu and row i of
+    P*a is row perm[i] of a
+    """
+    n = len(a)
+    lu = [row[:] for row in a]
+    perm = list(range(n))
+    for col in range(n):
+        pivot_row = col
+        while lu[pivot_row][col].num == 0:
+            pivot_row += 1
+            if pivot_row == n:
+                raise ZeroDivisionError("Singular matrix")
+        lu[col], lu[pivot_row] = lu[pivot_row], lu[col]
+        perm[col], perm[pivot_row] = perm[pivot_row], perm[col]
+        for row in range(col + 1, n):
+            if lu[row][col].num == 0:
+                continue
+            factor = (lu[row][col] / lu[col][col]).normalize()
+            lu[row][col] = factor
+            for other in range(col + 1, n):
+                lu[row][other] = (lu[row][other] - factor * lu[col][other]).normalize()
+    return lu, perm
+
+def lu_solve(factorization, b):
+    """
+    Solves a * x = b for one right hand side b (list of FracOps) given lu_factorize(a)
+    """
+    lu, perm = factorization
+    n = len(lu)
+    y = [b[pos] for pos in perm]
+    for row in range(n):
+        for col in range(row):
+            y[row] = y[row] - lu[row][col] * y[col]
+        y[row] = y[row].normalize()
+    for row in range(n - 1, -1, -1):
+        for col in range(row + 1, n):
+            y[row] = y[row] - lu[row][col] * y[col]
+        y[row] = (y[row] / lu[row][row]).normalize()
+    return y
+
+class FactorizationCache(object):
+    """
+    LRU cache of lu_factorize(I - Q) keyed by a hash of Q, so matrices sharing the
+    same transient part are only factorized once, maxsize <= 0 turns caching off
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.store = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(q):
+        flat = [(val.num, val.den) for row in q for val in row]
+        return hashlib.sha1(repr((len(q), flat)).encode()).hexdigest()
+
+    def factorize(self, q):
+        key = self.key(q)
+        if key in self.store:
+            self.hits += 1
+            factorization = self.store.pop(key)
+        else:
+            self.misses += 1
+            factorization = lu_factorize(mat_subtract(get_unitmatrix(len(q)), q))
+            if self.maxsize <= 0:
+                return factorization
+            if len(self.store) >= self.maxsize:
+                self.store.popitem(last=False) # least recently used
+        self.store[key] = factorization
+        return factorization
+
+factorization_cache = FactorizationCache()
+
+def absorption_distributions(mat, cache=None):
+    """
+    Answer in the solution format for every transient state as a start state,
+    returns {state: [num_1, ... num_k, den]}.
+    (I - Q) is factorized once (or taken from cache) and reused for every column of R.
+    """
+    cache = factorization_cache if cache is None else cache
+    nonabsorbing = [pos for pos, row in enumerate(mat) if any(row)]
+    if not nonabsorbing:
+        return {}
+    standard, num_absorption = arrange_mat(mat)
+    mat_frac = convert_frac([row[:] for row in standard])
+    q = [row[num_absorption:] for row in mat_frac[num_absorption:]] # submatrix Q
+    r = [row[:num_absorption] for row in mat_frac[num_absorption:]] # submatrix R
+    factorization = cache.factorize(q)
+    columns = [lu_solve(factorization, list(col)) for col in zip(*r)]
+    rows = transpose_matrix(columns) # (I - Q)^-1 * R
+    common = FracOps(1,1)
+    return dict((state, common.common_den(row)) for state, row in zip(nonabsorbing, rows))
+
+def batch_solutions(mats, cache=None):
+    """
+    absorption_distributions for many matrices, sharing one factorization cache
+    """
+    return [absorption_distributions(mat, cache) for mat in mats]
+
+## floating point fast path
+
+def solution_float(mat, verify=False, tolerance=1e-9):
+    """
+    Absorption probabilities from state 0 as a float vector, solved with numpy
+    (LAPACK) on (I - Q)^T z = e_0 and then z^T R, same as start_state_row.
+    With verify=True the exact solution is computed as well and every probability
+    has to be within tolerance of num/den, otherwise ValueError is raised.
+    Going the other way (guessing num/den back from the float) is not reliable,
+    the true denominators quickly get past what float64 can tell apart.
+    """
+    if np is None:
+        raise ImportError("numpy is required for solution_float")
+    standard, num_absorption = arrange_mat(mat)
+    if all([i==0 for i in mat[0]]):
+        probs = np.zeros(num_absorption)
+        probs[0] = 1.0
+    else:
+        counts = np.array(standard[num_absorption:], dtype=float)
+        trans = counts / counts.sum(axis=1)[:, np.newaxis]
+        q = trans[:, num_absorption:]
+        r = trans[:, :num_absorption]
+        e_0 = np.zeros(len(q))
+        e_0[0] = 1.0
+        z = np.linalg.solve(np.eye(len(q)) - q.T, e_0)
+        probs = z.dot(r)
+    if verify:
+        exact = solution([row[:] for row in mat])
+        den = exact[-1]
+        expected = np.array([float(Fraction(num, den)) for num in exact[:-1]])
+        if not np.allclose(probs, expected, rtol=0, atol=tolerance):
+            raise ValueError("float solution does not match the exact one: %s vs %s"
+                             % (list(probs), exact))
+    return probs
+
+def solution(mat, start_only=True, backend='integer'):
     """
     We use the idea of absorbing markov state to solve this problem
     some terms are as follows
@@ -221,7 +672,21 @@ def solution(mat):
     
     hence non absorbing state to absorbing state via all possible path any number of time is SR
     which is (I-Q)^-1 * R
+
+    Only the row of state 0 is reported, so by default we solve for that row alone
+    (see start_state_row), start_only=False solves for every start state and keeps row 0.
+
+    backend='integer' scales every row by its total count and runs fraction free
+    elimination on plain ints (solve_integer), backend='fraction' runs on FracOps.
+    A dict {state: {next_state: count}} is solved sparsely, component by component
+    (solve_components), backend='components' does the same for a dense matrix.
     """
+    if isinstance(mat, dict):
+        return solve_components(mat)
+    if backend == 'components':
+        adjacency = dict((pos, dict((col, count) for col, count in enumerate(row) if count))
+                         for pos, row in enumerate(mat))
+        return solve_components(adjacency, len(mat))
     
     standard, num_absorption = arrange_mat(mat) # getting into standard form
     
@@ -233,18 +698,57 @@ def solution(mat):
         result.append(1)
         return result
     
+    if backend == 'integer':
+        return solve_integer(standard, num_absorption, start_only)
+    if backend != 'fraction':
+        raise ValueError("unknown backend: %s" % backend)
+
     mat_frac = convert_frac(standard) # get in fractional format this helps formatting
 
     nonnum_absorption = len(mat) - num_absorption
 
     q = [row[num_absorption:] for row in mat_frac[num_absorption:]] # submatrix Q
     r = [row[:num_absorption] for row in mat_frac[num_absorption:]] # submatrix R
-    iq = get_unitmatrix(nonnum_absorption) # (I - Q)
-    inv = get_matrix_inverse(mat_subtract(iq,q)) # (I - Q)^-1
-
-    result = matmult(inv, r) # (I - Q)^-1 * R
+    iq = get_unitmatrix(nonnum_absorption)
+    i_minus_q = mat_subtract(iq,q)
+    if start_only:
+        return FracOps(1,1).common_den(start_state_row(i_minus_q, r))
+    # (I - Q)^-1 * R is the solution X of (I - Q) X = R, no need to form the inverse
+    result = gauss_jordan_solve(i_minus_q, r)
 
     return FracOps(1,1).common_den(result[0]) # 0 th place will be for state 0
+
+def random_chain(num_states, num_absorbing, seed=0):
+    """
+    Random transition count matrix where every transient state can reach a terminal one
+    """
+    rng = random.Random(seed)
+    transient = num_states - num_absorbing
+    mat = []
+    for pos in range(num_states):
+        row = [0] * num_states
+        if pos < transient:
+            for _ in range(3):
+                row[rng.randrange(num_states)] += rng.randint(1, 9)
+            row[rng.randrange(transient, num_states)] += 1
+        mat.append(row)
+    return mat
+
+def benchmark(sizes=(10, 20, 40), num_absorbing=10):
+    """
+    Times the start state only solve against the full solve for every start state
+    """
+    for num_states in sizes:
+        mat = random_chain(num_states + num_absorbing, num_absorbing)
+        start = time.time()
+        full = solution([row[:] for row in mat], start_only=False)
+        full_time = time.time() - start
+        start = time.time()
+        row_only = solution([row[:] for row in mat])
+        row_time = time.time() - start
+        assert full == row_only
+        print("transient=%d full %.3fs start row %.3fs speedup %.1fx" % (
+            num_states, full_time, row_time, full_time / max(row_time, 1e-9)))
     
     
 if __name__ =="__main__":
@@ -261,7 +765,7 @@ if __name__ =="__main__":
         [0]
     ]
     print(solution(mat))
-    
+
     mat =[
         [0, 86, 61, 189, 0, 18, 12, 33, 66, 39],
         [0, 0, 2, 0, 0, 1, 0, 0, 0, 0],
@@ -274,4 +778,6 @@ if __name__ =="__main__":
         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
     ]
-    print(solution(mat))
\ No newline at end of file
+    print(solution(mat))
+    if 'benchmark' in sys.argv[1:]:
+        benchmark()
\ No newline at end of file
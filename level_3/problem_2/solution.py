@@ -1,182 +1,569 @@
+import collections
+import multiprocessing
+import re
+import sys
+import time
+from array import array
+
+BASE_DIGITS = 9
+BASE = 10**BASE_DIGITS
+KARATSUBA_THRESHOLD = 40 # limbs, below this schoolbook multiplication is faster
+NEWTON_THRESHOLD = 3000 # limbs of divisor and of quotient before Newton division pays off
+HGCD_THRESHOLD = 5000 # limbs, below this Lehmer steps are faster than the half gcd
+HGCD_RECURSE_THRESHOLD = 150 # limbs, inside the half gcd below this it divides step by step
+
+## limb list helpers, little endian lists (or arrays) of limbs
+
+def strip_limbs(limbs):
+    """
+    Removes the high zero limbs in place, zero is [0]
+    """
+    while len(limbs) > 1 and limbs[-1] == 0:
+        limbs.pop()
+    if not limbs:
+        limbs.append(0)
+    return limbs
+
+def compare_limbs(limbs1, limbs2):
+    """
+    -1, 0 or 1, both have to be stripped
+    """
+    if len(limbs1) != len(limbs2):
+        return 1 if len(limbs1) > len(limbs2) else -1
+    for pos in range(len(limbs1) - 1, -1, -1):
+        if limbs1[pos] != limbs2[pos]:
+            return 1 if limbs1[pos] > limbs2[pos] else -1
+    return 0
+
+def add_limbs(limbs1, limbs2):
+    """
+    The carry goes in place on a copy of the longer operand, so the result is an
+    array when that operand is one
+    """
+    if len(limbs1) < len(limbs2):
+        limbs1, limbs2 = limbs2, limbs1
+    result = limbs1[:]
+    carry = 0
+    for pos in range(len(result)):
+        if pos >= len(limbs2) and carry == 0:
+            break
+        total = result[pos] + carry + (limbs2[pos] if pos < len(limbs2) else 0)
+        carry = 1 if total >= BASE else 0
+        result[pos] = total - BASE if carry else total
+    if carry:
+        result.append(carry)
+    return result
+
+def sub_limbs(limbs1, limbs2):
+    """
+    limbs1 - limbs2, limbs1 has to be the larger value.
+    Same as add_limbs, the result has the type of limbs1
+    """
+    result = limbs1[:]
+    borrow = 0
+    for pos in range(len(result)):
+        if pos >= len(limbs2) and borrow == 0:
+            break
+        total = result[pos] - borrow - (limbs2[pos] if pos < len(limbs2) else 0)
+        borrow = 1 if total < 0 else 0
+        result[pos] = total + BASE if borrow else total
+    if borrow:
+        raise ValueError("negative result in subtraction")
+    return strip_limbs(result)
+
+def mul_small(limbs, multiple):
+    """
+    Multiplication by one limb, the result is not stripped and has the type of limbs
+    """
+    result = limbs[:0]
+    carry = 0
+    for limb in limbs:
+        carry, low = divmod(limb * multiple + carry, BASE)
+        result.append(low)
+    while carry: # a multiple above BASE can carry more than one limb
+        carry, low = divmod(carry, BASE)
+        result.append(low)
+    return result
+
+def divmod_small(limbs, divisor):
+    """
+    Short division by one limb, returns (quotient limbs, remainder int)
+    """
+    quotient = [0] * len(limbs)
+    remainder = 0
+    for pos in range(len(limbs) - 1, -1, -1):
+        quotient[pos], remainder = divmod(remainder * BASE + limbs[pos], divisor)
+    return strip_limbs(quotient), remainder
+
+def mul_limbs(limbs1, limbs2):
+    """
+    Product of two limb lists, Karatsuba above KARATSUBA_THRESHOLD limbs
+    """
+    if len(limbs1) < len(limbs2):
+        limbs1, limbs2 = limbs2, limbs1
+    if len(limbs2) < KARATSUBA_THRESHOLD:
+        result = [0] * (len(limbs1) + len(limbs2))
+        for pos2, limb2 in enumerate(limbs2):
+            if limb2 == 0:
+                continue
+            carry = 0
+            pos = pos2
+            for limb1 in limbs1:
+                carry, result[pos] = divmod(result[pos] + limb1 * limb2 + carry, BASE)
+                pos += 1
+            while carry:
+                carry, result[pos] = divmod(result[pos] + carry, BASE)
+                pos += 1
+        return strip_limbs(result)
+    half = len(limbs1) // 2
+    low1, high1 = strip_limbs(limbs1[:half]), limbs1[half:]
+    if len(limbs2) <= half:
+        # unbalanced, split only the longer one
+        low = mul_limbs(low1, limbs2)
+        high = mul_limbs(high1, limbs2)
+        return add_limbs(low, shift_limbs(high, half))
+    low2, high2 = strip_limbs(limbs2[:half]), limbs2[half:]
+    z0 = mul_limbs(low1, low2)
+    z2 = mul_limbs(high1, high2)
+    z1 = sub_limbs(sub_limbs(mul_limbs(add_limbs(low1, high1), add_limbs(low2, high2)), z0), z2)
+    return add_limbs(add_limbs(z0, shift_limbs(z1, half)), shift_limbs(z2, 2 * half))
+
+def shift_limbs(limbs, num_limbs):
+    """
+    limbs * BASE^num_limbs
+    """
+    if len(limbs) == 1 and limbs[0] == 0:
+        return [0]
+    return [0] * num_limbs + list(limbs)
+
+def divmod_knuth(dividend, divisor):
+    """
+    Knuth's Algorithm D (TAOCP vol 2, 4.3.1), one quotient limb per step.
+    Both are normalized so the top divisor limb is at least BASE/2, then every
+    quotient limb guessed from the top two limbs is at most 2 too large and the
+    test against the second divisor limb catches nearly all of those, the rare
+    leftover shows up as a negative partial remainder and is added back.
+    Returns (quotient, remainder) limb lists.
+    """
+    num_div = len(divisor)
+    if num_div == 1:
+        quotient, remainder = divmod_small(dividend, divisor[0])
+        return quotient, [remainder]
+    if compare_limbs(dividend, divisor) < 0:
+        return [0], list(dividend)
+
+    scale = BASE // (divisor[-1] + 1)
+    v = mul_small(divisor, scale) # stays num_div limbs
+    u = mul_small(dividend, scale)
+    if len(u) == len(dividend):
+        u.append(0)
+    num_quot = len(dividend) - num_div
+    v_top, v_next = v[-1], v[-2]
+    quotient = [0] * (num_quot + 1)
+    for j in range(num_quot, -1, -1):
+        q_hat, r_hat = divmod(u[j + num_div] * BASE + u[j + num_div - 1], v_top)
+        while q_hat >= BASE or q_hat * v_next > r_hat * BASE + u[j + num_div - 2]:
+            q_hat -= 1
+            r_hat += v_top
+            if r_hat >= BASE:
+                break
+        # u[j .. j + num_div] -= q_hat * v, in place
+        carry = 0
+        borrow = 0
+        for pos in range(num_div):
+            carry, low = divmod(q_hat * v[pos] + carry, BASE)
+            total = u[pos + j] - low - borrow
+            borrow = 1 if total < 0 else 0
+            u[pos + j] = total + BASE if borrow else total
+        total = u[j + num_div] - carry - borrow
+        if total < 0:
+            # q_hat was one too large, add the divisor back
+            q_hat -= 1
+            carry = 0
+            for pos in range(num_div):
+                total_add = u[pos + j] + v[pos] + carry
+                carry = 1 if total_add >= BASE else 0
+                u[pos + j] = total_add - BASE if carry else total_add
+            total = 0
+        u[j + num_div] = total
+        quotient[j] = q_hat
+    remainder, _ = divmod_small(u[:num_div], scale)
+    return strip_limbs(quotient), remainder
+
+def reciprocal_limbs(divisor, precision):
+    """
+    floor(BASE^precision / divisor), precision has to be at least len(divisor).
+    The reciprocal is first found to half the limbs from the top limbs of the
+    divisor only (recursively), then one Newton step
+        x <- x + x (BASE^precision - divisor x) / BASE^precision
+    doubles the number of correct limbs, so the whole cost is a few multiplications
+    of the final size. Small cases are left to Algorithm D.
+    """
+    num_div = len(divisor)
+    extra = precision - num_div # about the number of limbs of the result
+    power = [0] * precision + [1]
+    if extra < 2 * KARATSUBA_THRESHOLD or num_div < 2:
+        return divmod_knuth(power, divisor)[0]
+
+    half = extra // 2 + 1
+    cut = max(0, num_div - (half + 2)) # low limbs not needed at half precision
+    top = divisor[cut:]
+    x = shift_limbs(reciprocal_limbs(top, len(top) + half), extra - half)
+
+    product = mul_limbs(divisor, x)
+    if compare_limbs(product, power) <= 0:
+        error = sub_limbs(power, product)
+        x = add_limbs(x, mul_limbs(x, error)[precision:] or [0])
+    else:
+        error = sub_limbs(product, power)
+        x = sub_limbs(x, add_limbs(mul_limbs(x, error)[precision:] or [0], [1]))
+    # the truncations leave x at most a couple of units off
+    product = mul_limbs(divisor, x)
+    while compare_limbs(product, power) > 0:
+        x = sub_limbs(x, [1])
+        product = sub_limbs(product, divisor)
+    while True:
+        next_product = add_limbs(product, divisor)
+        if compare_limbs(next_product, power) > 0:
+            break
+        product = next_product
+        x = add_limbs(x, [1])
+    return x
+
+def divmod_newton(dividend, divisor):
+    """
+    Division through a Newton reciprocal, O(M(n) log n) instead of O(m n)
+    for a long quotient of a long divisor. The quotient estimate from the
+    reciprocal is at most one too small.
+    """
+    if len(divisor) < 2 or compare_limbs(dividend, divisor) < 0:
+        return divmod_knuth(dividend, divisor)
+    precision = len(dividend) + 1
+    x = reciprocal_limbs(divisor, precision)
+    quotient = strip_limbs(mul_limbs(dividend, x)[precision:])
+    remainder = sub_limbs(dividend, mul_limbs(quotient, divisor))
+    while compare_limbs(remainder, divisor) >= 0:
+        remainder = sub_limbs(remainder, divisor)
+        quotient = add_limbs(quotient, [1])
+    return quotient, remainder
+
+def divmod_limbs(dividend, divisor):
+    """
+    Algorithm D, or Newton division when both the divisor and the quotient are long
+    """
+    if (len(divisor) >= NEWTON_THRESHOLD
+            and len(dividend) - len(divisor) >= NEWTON_THRESHOLD):
+        return divmod_newton(dividend, divisor)
+    return divmod_knuth(dividend, divisor)
+
+def int_to_limbs(val):
+    """
+    Limbs of a small non negative python int (a machine word or two)
+    """
+    limbs = []
+    while True:
+        val, low = divmod(val, BASE)
+        limbs.append(low)
+        if val == 0:
+            return limbs
+
+def limbs_from_str(str_int):
+    """
+    Little endian limbs of a decimal string
+    """
+    str_int = str_int.lstrip('0') or '0'
+    # cut the decimal string into 9 digit limbs from the right
+    return [int(str_int[max(0, end - BASE_DIGITS):end])
+            for end in range(len(str_int), 0, -BASE_DIGITS)]
+
+def limbs_to_str(limbs):
+    return str(limbs[-1]) + ''.join(
+        [str(limbs[pos]).zfill(BASE_DIGITS) for pos in range(len(limbs) - 2, -1, -1)])
+
+def is_zero_limbs(limbs):
+    return len(limbs) == 1 and limbs[0] == 0
+
+## generation counting, sum of the quotients of Euclid's algorithm
+
+def combine_limbs(coef1, limbs1, coef2, limbs2):
+    """
+    coef1 * limbs1 + coef2 * limbs2 for word sized coefficients of opposite signs
+    (or zero), the caller knows the result is not negative
+    """
+    positive = [0]
+    negative = [0]
+    for coef, limbs in ((coef1, limbs1), (coef2, limbs2)):
+        if coef > 0:
+            positive = add_limbs(positive, strip_limbs(mul_small(limbs, coef)))
+        elif coef < 0:
+            negative = add_limbs(negative, strip_limbs(mul_small(limbs, -coef)))
+    return sub_limbs(positive, negative)
+
+def lehmer_step(big, small):
+    """
+    Lehmer's algorithm (Knuth's Algorithm L): runs Euclid on the leading two limbs of
+    both numbers, the same limbs cut from each, keeping the cofactors a, b, c, d of
+        big' = a big + b small, small' = c big + d small
+    A quotient is only taken when both ends of its possible range agree, so every one
+    is an exact quotient of the full numbers. Returns (sum of quotients, big', small')
+    or None when not even one quotient could be settled.
+    """
+    shift = len(big) - 2
+    top_big = big[-1] * BASE + big[-2]
+    top_small = 0
+    for pos in (shift + 1, shift):
+        top_small = top_small * BASE + (small[pos] if pos < len(small) else 0)
+    a, b, c, d = 1, 0, 0, 1
+    quotient_sum = 0
+    while top_small + c != 0 and top_small + d != 0:
+        quotient = (top_big + a) // (top_small + c)
+        if quotient != (top_big + b) // (top_small + d):
+            break
+        a, c = c, a - quotient * c
+        b, d = d, b - quotient * d
+        top_big, top_small = top_small, top_big - quotient * top_small
+        quotient_sum += quotient
+    if quotient_sum == 0:
+        return None
+    return quotient_sum, combine_limbs(a, big, b, small), combine_limbs(c, big, d, small)
+
+class EuclidMatrix(object):
+    """
+    Product of the Euclid step matrices [[q, 1], [1, 0]] taken so far, so that
+    (big, small) = M * (big', small'). All entries are non negative limb lists,
+    det is (-1)^(number of steps) and the quotients are kept to be able to undo steps.
+    """
+    def __init__(self):
+        self.m00, self.m01, self.m10, self.m11 = [1], [0], [0], [1]
+        self.quotients = []
+
+    def det(self):
+        return -1 if len(self.quotients) % 2 else 1
+
+    def push(self, quotient):
+        """
+        M <- M * [[q, 1], [1, 0]]
+        """
+        self.m00, self.m01 = add_limbs(mul_limbs(self.m00, quotient), self.m01), self.m00
+        self.m10, self.m11 = add_limbs(mul_limbs(self.m10, quotient), self.m11), self.m10
+        self.quotients.append(quotient)
+
+    def pop(self):
+        """
+        M <- M * [[q, 1], [1, 0]]^-1, undoing the last step
+        """
+        quotient = self.quotients.pop()
+        self.m00, self.m01 = self.m01, sub_limbs(self.m00, mul_limbs(self.m01, quotient))
+        self.m10, self.m11 = self.m11, sub_limbs(self.m10, mul_limbs(self.m11, quotient))
+
+    def extend(self, other):
+        """
+        M <- M * other
+        """
+        m00 = add_limbs(mul_limbs(self.m00, other.m00), mul_limbs(self.m01, other.m10))
+        m01 = add_limbs(mul_limbs(self.m00, other.m01), mul_limbs(self.m01, other.m11))
+        m10 = add_limbs(mul_limbs(self.m10, other.m00), mul_limbs(self.m11, other.m10))
+        m11 = add_limbs(mul_limbs(self.m10, other.m01), mul_limbs(self.m11, other.m11))
+        self.m00, self.m01, self.m10, self.m11 = m00, m01, m10, m11
+        self.quotients.extend(other.quotients)
+
+    def reduce(self, big, small):
+        """
+        M^-1 * (big, small) if M is a valid start of the quotient sequence of
+        big / small, otherwise None.
+        M = [[m00, m01], [m10, m11]] has det +-1 so the inverse only needs products,
+        and the quotients are exactly the first Euclid quotients iff the reduced pair
+        satisfies big' > small' > 0 (then every complete quotient lies strictly between
+        its partial quotient and the next integer, continued fractions being unique)
+        """
+        first = mul_limbs(self.m11, big), mul_limbs(self.m01, small)
+        second = mul_limbs(self.m00, small), mul_limbs(self.m10, big)
+        if self.det() < 0:
+            first, second = first[::-1], second[::-1]
+        if compare_limbs(first[0], first[1]) < 0 or compare_limbs(second[0], second[1]) < 0:
+            return None
+        new_big = sub_limbs(first[0], first[1])
+        new_small = sub_limbs(second[0], second[1])
+        if is_zero_limbs(new_small) or compare_limbs(new_big, new_small) <= 0:
+            return None
+        return new_big, new_small
+
+def reduce_valid(matrix, big, small):
+    """
+    Applies matrix to (big, small), undoing its last steps until it is valid
+    """
+    while True:
+        reduced = matrix.reduce(big, small)
+        if reduced is not None:
+            return reduced
+        matrix.pop() # the identity is always valid as big > small > 0
+
+def half_gcd(big, small):
+    """
+    Subquadratic half gcd: takes Euclid steps on big > small > 0 until small drops
+    to about half the limbs of big, computing them from the top halves of the numbers
+    recursively instead of dividing the full numbers. Returns (matrix, big', small')
+    where matrix holds the quotients taken, small' is never taken down to 0.
+    """
+    size = len(big)
+    target = size // 2 + 1
+    matrix = EuclidMatrix()
+    if len(small) <= target:
+        return matrix, big, small
+
+    if size >= HGCD_RECURSE_THRESHOLD:
+        # steps of the top half are steps of the whole number (after validation)
+        cut = size // 2
+        first, _, _ = half_gcd(big[cut:], strip_limbs(small[cut:]) if len(small) > cut else [0])
+        big, small = reduce_valid(first, big, small)
+        matrix.extend(first)
+        if len(small) > target:
+            quotient, remainder = divmod_limbs(big, small)
+            if is_zero_limbs(remainder):
+                return matrix, big, small
+            matrix.push(quotient)
+            big, small = small, remainder
+        cut = 2 * target - len(big)
+        if len(small) > target and cut > 0 and len(small) > cut:
+            second, _, _ = half_gcd(big[cut:], strip_limbs(small[cut:]))
+            big, small = reduce_valid(second, big, small)
+            matrix.extend(second)
+
+    # whatever is left (or everything on small input) one division at a time
+    while len(small) > target:
+        quotient, remainder = divmod_limbs(big, small)
+        if is_zero_limbs(remainder):
+            break
+        matrix.push(quotient)
+        big, small = small, remainder
+    return matrix, big, small
+
+def generation_count(big, small):
+    """
+    Sum of all the quotients of Euclid's algorithm on big >= small >= 1, and the gcd.
+    Half gcd on long numbers, Lehmer steps on word sized leading limbs below that,
+    a full division only when neither can settle a quotient (a huge quotient).
+    """
+    total = [0]
+    while not is_zero_limbs(small):
+        if len(small) >= HGCD_THRESHOLD:
+            matrix, new_big, new_small = half_gcd(big, small)
+            if matrix.quotients:
+                for quotient in matrix.quotients:
+                    total = add_limbs(total, quotient)
+                big, small = new_big, new_small
+                continue
+        elif len(big) >= 2:
+            step = lehmer_step(big, small)
+            if step is not None:
+                quotient_sum, big, small = step
+                total = add_limbs(total, int_to_limbs(quotient_sum))
+                continue
+        quotient, remainder = divmod_limbs(big, small)
+        total = add_limbs(total, quotient)
+        big, small = small, remainder
+    return total, big
+
 class IntegerCalculation(object):
     """
     Big integer class for handling 
     comparison operation, substraction, addition,
     long division
+
+    Non negative integers are stored as base 10^9 limbs in an array,
+    least significant limb first, always without leading (high) zero limbs
+    so comparisons never have to normalize.
     """
-    def __init__(self, str_int):
-        ## left most bit is the most significant one
-        self.int_arr = [int(i) for i in str_int]
-        self.normalize()
-    
-    @staticmethod
-    def handle_carryover(list_ints):
+    def __init__(self, str_int='0'):
+        self.limbs = array('L', limbs_from_str(str_int))
+
+    @classmethod
+    def from_limbs(cls, limbs):
         """
-        Handles the carry over by carring over the tenths place
+        Wraps a little endian limb array, dropping high zero limbs
         """
-        carry_over = 0
-        carried_val = []
-        for ints in reversed(list_ints):
-            total = ints + carry_over
-            carry_over = total//10
-            carried_val.insert(0, (total%10))
+        obj = cls.__new__(cls)
+        obj.limbs = limbs
+        obj.normalize()
+        return obj
 
-        if carry_over > 0:
-            carried_val = [carry_over] + carried_val
-
-        return carried_val
-    
     def normalize(self):
         """
-        Removes all the initial zeroes to represent in the shortest form
+        Removes all the high zero limbs to represent in the shortest form
         """
-        new_ar = []
-        non_zero_encountered = False
-        for ele in self.int_arr:
-            if (ele == 0) and (not non_zero_encountered):
-                continue
-            non_zero_encountered = True
-            new_ar.append(ele)
-        self.int_arr = new_ar
-        # incase its a zero int
-        if len(self.int_arr) == 0:
-            self.int_arr = [0]
+        limbs = self.limbs
+        while len(limbs) > 1 and limbs[-1] == 0:
+            limbs.pop()
+        if len(limbs) == 0:
+            limbs.append(0)
+
+    def is_zero(self):
+        return len(self.limbs) == 1 and self.limbs[0] == 0
+
+    def is_one(self):
+        return len(self.limbs) == 1 and self.limbs[0] == 1
+
+    def __str__(self):
+        return limbs_to_str(self.limbs)
+
+    def compare(self, arr_int):
+        """
+        -1, 0 or 1 as self is smaller, equal or larger
+        """
+        return compare_limbs(self.limbs, arr_int.limbs)
 
     def __gt__(self, arr_int):
-        
-        self.normalize()
-        arr_int.normalize()
-        if len(self.int_arr) > len(arr_int.int_arr):
-            return True
-        if len(self.int_arr) < len(arr_int.int_arr):
-            return False
-        for el1, el2 in zip(self.int_arr, arr_int.int_arr):
-            if el1 > el2:
-                return True
-            if el1 < el2:
-                return False
-        return False
-    
+        return self.compare(arr_int) > 0
+
+    def __lt__(self, arr_int):
+        return self.compare(arr_int) < 0
+
     def __ge__(self, arr_int):
-        return self > arr_int or self == arr_int
+        return self.compare(arr_int) >= 0
 
     def __eq__(self, arr_int):
-        self.normalize()
-        arr_int.normalize()
-        if len(self.int_arr) != len(arr_int.int_arr):
-            return False
-        for el1, el2 in zip(self.int_arr, arr_int.int_arr):
-            if el1 != el2:
-                return False
-        return True
+        return self.compare(arr_int) == 0
+
+    def __ne__(self, arr_int):
+        return self.compare(arr_int) != 0
     
     def __sub__(self, arr_int):
         """
-        Normal subtraction and carry over handling
+        Normal subtraction and borrow handling, self has to be the larger one
         """
-        self.normalize()
-        arr_int.normalize()
-
-        larger = self.int_arr
-        smaller = arr_int.int_arr
-        diff = len(larger) - len(smaller)
-        if diff > 0:
-            smaller = [0]*diff + smaller
-        else:
-            larger = [0]* abs(diff) + larger
-        total_sum = []
-        for val1, val2 in zip(larger, smaller):
-            total_sum.append((val1 - val2))
-
-        return IntegerCalculation(self.handle_carryover(total_sum))
+        return IntegerCalculation.from_limbs(sub_limbs(self.limbs, arr_int.limbs))
     
     def __add__(self, arr_int):
         """
-        Addition and carry over normalization
+        Addition and carry over propagation
         """
-        self.normalize()
-        arr_int.normalize()
-
-        larger = self.int_arr
-        smaller = arr_int.int_arr
-        diff = len(larger) - len(smaller)
-        if diff > 0:
-            smaller = [0]*diff + smaller
-        else:
-            larger = [0]* abs(diff) + larger
-        total_sum = []
-        for val1, val2 in zip(larger, smaller):
-            total_sum.append((val1 + val2))
-
-        return IntegerCalculation(self.handle_carryover(total_sum))
+        return IntegerCalculation.from_limbs(add_limbs(self.limbs, arr_int.limbs))
 
-    def single_digitmult(self, digit):
+    def single_limbmult(self, multiple):
         """
-        Single digit multiplication
+        Multiplication by one limb (0 <= multiple < BASE)
         """
-        mult_result = [ele * digit for ele in self.int_arr]
-        mult_result = self.handle_carryover(mult_result)
+        return IntegerCalculation.from_limbs(mul_small(self.limbs, multiple))
 
-        return IntegerCalculation(mult_result)
-
-    def divide_once(self,remainder):
+    def __mul__(self, arr_int):
         """
-        As multiplication is a costly operation we try to estimate the multiple using
-        the first three digits of divisor and dividend and generally get the estimate with only 
-        3 try at max.
-        And rest is simple subtraction and remainder carry
+        Full multiplication, Karatsuba for long operands.
+        The product is built in a fresh list, only that is copied into an array
         """
-        multiple = self.estimate_multiple(remainder)
-        mul_val = self.single_digitmult(multiple)
-        while remainder >= mul_val and multiple < 10:
-            multiple += 1
-            mul_val = self.single_digitmult(multiple)
-        
-        multiple -= 1 # so that we don't go beyond what is required
-        mul_val = self.single_digitmult(multiple)
-        remainder = remainder - mul_val
-        return remainder, multiple
+        return IntegerCalculation.from_limbs(
+            array('L', mul_limbs(self.limbs, arr_int.limbs)))
 
     def long_division(self, arr_int):
         """
-        big int implementation of long division
-        """
-        pos = 0
-        remainder = IntegerCalculation([0])
-        quotient = []
-        while True:
-            try:
-                remainder = IntegerCalculation(
-                    (remainder.int_arr + [arr_int.int_arr[pos]]))
-            except IndexError:
-                # we have reached the end
-                break
-            if self > remainder:
-                quotient.append(0)
-                pos += 1
-                continue
-            remainder, multiple = self.divide_once(remainder)
-            quotient.append(multiple)
-            check_fordivision = False
-            pos += 1
-        
-        return IntegerCalculation(quotient), remainder
-
-    def estimate_multiple(self, numerator):
-        """
-        Actually estimates the multiple required for a certain iteration of the 
-        division. normalize function always ensures we don't wound up with a zero division
-        if zero was not explicitly passed, as we deal with positive integer so we don't bother with it
+        big int implementation of long division, arr_int // self and arr_int % self
+        Knuth's Algorithm D, or Newton reciprocal division once both the divisor and
+        the quotient are longer than NEWTON_THRESHOLD limbs
         """
-        num = float("0." + ''.join([str(i) for i in numerator.int_arr[:3]]))
-        den = float("0." + ''.join([str(i) for i in self.int_arr[:3]]))
-        
-        #increase the denominator so that we estimate lower that what is required
-        den += 0.01
-
-        div = num/den
-
-        return int(div)
+        if self.is_zero():
+            raise ZeroDivisionError("division by zero")
+        quotient, remainder = divmod_limbs(list(arr_int.limbs), list(self.limbs))
+        return (IntegerCalculation.from_limbs(array('L', quotient)),
+                IntegerCalculation.from_limbs(array('L', remainder)))
 
 def solution(m,f):
     """
@@ -190,26 +577,144 @@ def solution(m,f):
     r (Mach bombs) and f (Facula bombs) and add q to the number of generation.
 
     Its just like finding gcd where we keep track of the quoteint along with the remainder. And all happens in bigint. 
+
+    Only the sum of the quotients is needed, so generation_count finds it with
+    Lehmer steps and the half gcd instead of one full long division per step.
+    """
+    return solve_pair(m, f)
+
+def solve_pair(m, f):
+    """
+    solution working on limb lists directly, no IntegerCalculation is built.
+    Pairs that fit in two limbs run Euclid on python ints.
+    """
+    big = limbs_from_str(m)
+    small = limbs_from_str(f)
+    if compare_limbs(big, small) < 0:
+        big, small = small, big
+    if is_zero_limbs(small):
+        return "impossible"
+    if len(big) <= 2:
+        big = big[-1] * BASE + big[0] if len(big) == 2 else big[0]
+        small = small[-1] * BASE + small[0] if len(small) == 2 else small[0]
+        generation = 0
+        while small:
+            quotient, remainder = divmod(big, small)
+            generation += quotient
+            big, small = small, remainder
+        # one is taken off as counting starts from 1,1 but we go all the way to zero
+        return str(generation - 1) if big == 1 else "impossible"
+    total, gcd_val = generation_count(big, small)
+    if gcd_val != [1]:
+        return "impossible"
+    return limbs_to_str(sub_limbs(total, [1]))
+
+def solution_euclid(m,f):
+    """
+    Plain Euclid's algorithm, one long division per step, kept for comparison
     """
     M_bomb = IntegerCalculation(m)
     F_bomb = IntegerCalculation(f)
     min_val = M_bomb if M_bomb < F_bomb else F_bomb
     max_val = M_bomb if M_bomb > F_bomb else F_bomb
-    generation = IntegerCalculation([-1])
-    # -1 as counting starts from 1,1 but while calculating we go all the way to zero
+    generation = IntegerCalculation()
     
     while True:
         quotient, new_minval = min_val.long_division(max_val)
-        new_minval.normalize()
         generation += quotient
-        if len(new_minval.int_arr) and new_minval.int_arr[0] == 0:
-            if len(min_val.int_arr) == 1 and min_val.int_arr[0] == 1:
-                return ''.join([str(i) for i in generation.int_arr])
+        if new_minval.is_zero():
+            if min_val.is_one():
+                return str(generation - IntegerCalculation('1'))
             return "impossible"
         
         max_val = min_val
         min_val = new_minval
     
 
+## batch driver for files of (M, F) pairs
+
+DIGITS_RE = re.compile('[0-9]+$') # str.isdigit also takes non ASCII digits like '\u00b2'
+
+def read_pairs(in_fp):
+    """
+    Lazily yields (m, f) string pairs from a file with one pair per line, separated
+    by white space or a comma. Blank lines are skipped.
+    """
+    for line_no, line in enumerate(in_fp, 1):
+        fields = line.replace(',', ' ').split()
+        if not fields:
+            continue
+        if len(fields) != 2 or not all([DIGITS_RE.match(field) for field in fields]):
+            raise ValueError("line %d: expected two non negative integers, got %r"
+                             % (line_no, line.rstrip('\n')))
+        yield fields[0], fields[1]
+
+def _chunks(pairs, chunk_size):
+    chunk = []
+    for pair in pairs:
+        chunk.append(pair)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _solve_chunk(chunk):
+    # one string per chunk keeps the pickling back to the parent cheap
+    return ''.join([solve_pair(m, f) + '\n' for m, f in chunk])
+
+def solve_file(in_fp, out_fp, workers=None, chunk_size=1000, max_pending=None,
+               report=sys.stderr):
+    """
+    Answers every (m, f) pair of in_fp, one answer per line on out_fp in input order.
+    Pairs are read lazily and sent to a process pool chunk_size at a time, at most
+    max_pending chunks (default twice the workers) are in flight, so memory stays
+    bounded whatever the size of the file. The oldest chunk is always written first,
+    which keeps the order.
+    workers=1 solves everything in this process. Returns the throughput stats
+    (also written to report unless it is None).
+    """
+    start = time.time()
+    stats = {'pairs': 0, 'chunks': 0}
+
+    def write(chunk, answers):
+        out_fp.write(answers)
+        stats['pairs'] += len(chunk)
+        stats['chunks'] += 1
+
+    chunks = _chunks(read_pairs(in_fp), chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            write(chunk, _solve_chunk(chunk))
+    else:
+        pool = multiprocessing.Pool(workers)
+        if max_pending is None:
+            max_pending = 2 * (workers or multiprocessing.cpu_count())
+        pending = collections.deque()
+        try:
+            for chunk in chunks:
+                if len(pending) >= max_pending:
+                    chunk_done, result = pending.popleft()
+                    write(chunk_done, result.get())
+                pending.append((chunk, pool.apply_async(_solve_chunk, (chunk,))))
+            while pending:
+                chunk_done, result = pending.popleft()
+                write(chunk_done, result.get())
+        finally:
+            pool.terminate()
+            pool.join()
+
+    stats['seconds'] = time.time() - start
+    stats['pairs_per_second'] = stats['pairs'] / stats['seconds'] if stats['seconds'] else 0.0
+    if report is not None:
+        report.write("%(pairs)d pairs in %(chunks)d chunks, %(seconds).2fs, "
+                     "%(pairs_per_second).0f pairs/s\n" % stats)
+    return stats
+
 if __name__ == "__main__":
-    print(solution("124","8"))
\ No newline at end of file
+    if sys.argv[1:2] == ['batch']:
+        # python solution.py batch <pairs file> <answers file>
+        with open(sys.argv[2]) as in_fp, open(sys.argv[3], 'w') as out_fp:
+            solve_file(in_fp, out_fp)
+    else:
+        print(solution("124","8"))
\ No newline at end of file